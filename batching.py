@@ -0,0 +1,219 @@
+import os
+import time
+import asyncio
+import logging
+
+from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import IntegrityError, DataError
+
+from database import engine
+from models import Penjualan as ModelPenjualan
+
+logger = logging.getLogger(__name__)
+
+PENJUALAN_BATCH_ENABLED = os.environ.get("PENJUALAN_BATCH_ENABLED", "false").lower() == "true"
+PENJUALAN_BATCH_SIZE = int(os.environ.get("PENJUALAN_BATCH_SIZE", 200))
+PENJUALAN_BATCH_MAX_DELAY_MS = int(os.environ.get("PENJUALAN_BATCH_MAX_DELAY_MS", 10))
+PENJUALAN_BATCH_QUEUE_SIZE = int(os.environ.get("PENJUALAN_BATCH_QUEUE_SIZE", 5000))
+# "sync": commit menunggu WAL flush ke disk, "async": synchronous_commit = off (lebih cepat,
+# transaksi terakhir bisa hilang kalau server database crash, tapi data tidak pernah korup)
+PENJUALAN_BATCH_DURABILITY = os.environ.get("PENJUALAN_BATCH_DURABILITY", "sync").lower()
+
+
+class BatchQueueFull(Exception):
+    pass
+
+
+class DuplicatePenjualan(Exception):
+    pass
+
+
+_PENDING = object()
+
+
+class PenjualanBatcher:
+    """Menampung penjualan di queue dan menulisnya per micro-batch, satu transaksi per batch."""
+
+    def __init__(self, batch_size=PENJUALAN_BATCH_SIZE, max_delay_ms=PENJUALAN_BATCH_MAX_DELAY_MS,
+                 queue_size=PENJUALAN_BATCH_QUEUE_SIZE, durability=PENJUALAN_BATCH_DURABILITY):
+        if durability not in ("sync", "async"):
+            raise ValueError(f"Unknown durability mode: {durability}")
+        self.batch_size = batch_size
+        self.max_delay = max_delay_ms / 1000
+        self.queue_size = queue_size
+        self.durability = durability
+        self.queue = None
+        self.worker = None
+        self.closing = False
+        self.metrics = {
+            "batches": 0,
+            "rows": 0,
+            "failed_rows": 0,
+            "rejected_rows": 0,
+            "last_batch_size": 0,
+            "max_batch_size": 0,
+            "total_flush_ms": 0.0,
+            "last_flush_ms": 0.0,
+            "max_flush_ms": 0.0,
+        }
+
+    @property
+    def running(self):
+        return self.worker is not None and not self.worker.done()
+
+    def start(self):
+        self.closing = False
+        self.queue = asyncio.Queue(maxsize=self.queue_size)
+        self.worker = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        # semua penjualan yang sudah masuk queue tetap ditulis sebelum worker berhenti
+        if not self.running:
+            return
+        self.closing = True
+        await self.queue.put(None)
+        await self.worker
+
+    async def submit(self, row: dict):
+        if self.closing or not self.running:
+            raise BatchQueueFull("Batch writer is not running")
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self.queue.put_nowait((row, future))
+        except asyncio.QueueFull:
+            self.metrics["rejected_rows"] += 1
+            raise BatchQueueFull("Penjualan queue is full")
+        return await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            item = await self.queue.get()
+            if item is None:
+                break
+            batch = [item]
+            deadline = loop.time() + self.max_delay
+            while len(batch) < self.batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self.queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            await self._flush(batch)
+
+        # sisa item yang masuk setelah sinyal stop
+        remaining = []
+        while not self.queue.empty():
+            item = self.queue.get_nowait()
+            if item is not None:
+                remaining.append(item)
+        for start in range(0, len(remaining), self.batch_size):
+            await self._flush(remaining[start:start + self.batch_size])
+
+    async def _flush(self, batch):
+        rows = [row for row, _ in batch]
+        started = time.perf_counter()
+        try:
+            results = await asyncio.get_running_loop().run_in_executor(None, self._write, rows)
+        except Exception as exc:
+            logger.exception("Penjualan batch flush failed")
+            results = [exc] * len(rows)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+        self._record(len(rows), elapsed_ms, sum(1 for result in results if result is not None))
+        for (row, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if result is None:
+                future.set_result(row)
+            else:
+                future.set_exception(result)
+
+    def _write(self, rows):
+        results = [_PENDING] * len(rows)
+        seen = set()
+        pending = []
+        for i, row in enumerate(rows):
+            if row["id_transaksi"] in seen:
+                results[i] = DuplicatePenjualan(f"Penjualan {row['id_transaksi']} already exists")
+            else:
+                seen.add(row["id_transaksi"])
+                pending.append(i)
+
+        try:
+            self._insert(rows, pending, results)
+        except Exception as exc:
+            # error selain data yang salah (koneksi putus, database mati) menggagalkan sisa batch sekaligus,
+            # baris dari bagian batch yang sudah commit tetap dilaporkan berhasil
+            logger.exception("Penjualan batch flush failed")
+            for i, result in enumerate(results):
+                if result is _PENDING:
+                    results[i] = exc
+        return results
+
+    def _insert(self, rows, indexes, results):
+        if not indexes:
+            return
+        table = ModelPenjualan.__table__
+        try:
+            with engine.begin() as conn:
+                self._set_durability(conn)
+                # satu INSERT multi-baris; id_transaksi yang sudah ada dilewati, bukan menggagalkan batch
+                inserted = set(conn.execute(
+                    insert(table)
+                    .values([rows[i] for i in indexes])
+                    .on_conflict_do_nothing(index_elements=[table.c.id_transaksi])
+                    .returning(table.c.id_transaksi)
+                ).scalars())
+        except (IntegrityError, DataError) as exc:
+            # baris lain yang salah (misalnya id_produk tidak ada): batch dibelah dua sampai
+            # baris yang salah terisolasi, untuk satu baris salah sekitar 2 * log2(n) transaksi tambahan
+            if len(indexes) == 1:
+                results[indexes[0]] = exc
+                return
+            middle = len(indexes) // 2
+            self._insert(rows, indexes[:middle], results)
+            self._insert(rows, indexes[middle:], results)
+            return
+
+        for i in indexes:
+            if rows[i]["id_transaksi"] in inserted:
+                results[i] = None
+            else:
+                results[i] = DuplicatePenjualan(f"Penjualan {rows[i]['id_transaksi']} already exists")
+
+    def _set_durability(self, conn):
+        if self.durability == "async":
+            conn.execute(text("SET LOCAL synchronous_commit = off"))
+
+    def _record(self, size, elapsed_ms, failed):
+        metrics = self.metrics
+        metrics["batches"] += 1
+        metrics["rows"] += size
+        metrics["failed_rows"] += failed
+        metrics["last_batch_size"] = size
+        metrics["max_batch_size"] = max(metrics["max_batch_size"], size)
+        metrics["total_flush_ms"] += elapsed_ms
+        metrics["last_flush_ms"] = elapsed_ms
+        metrics["max_flush_ms"] = max(metrics["max_flush_ms"], elapsed_ms)
+
+    def snapshot(self):
+        metrics = dict(self.metrics)
+        batches = metrics["batches"]
+        metrics["avg_batch_size"] = metrics["rows"] / batches if batches else 0
+        metrics["avg_flush_ms"] = metrics["total_flush_ms"] / batches if batches else 0
+        metrics["queue_depth"] = self.queue.qsize() if self.queue is not None else 0
+        metrics["enabled"] = PENJUALAN_BATCH_ENABLED
+        metrics["durability"] = self.durability
+        return metrics
+
+
+penjualan_batcher = PenjualanBatcher()
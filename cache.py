@@ -0,0 +1,147 @@
+import os
+import time
+from collections import OrderedDict
+
+from sqlalchemy import text
+
+from models import Supply as ModelSupply
+from models import CacheVersion as ModelCacheVersion
+
+SUPPLY_CACHE_ENABLED = os.environ.get("SUPPLY_CACHE_ENABLED", "true").lower() == "true"
+# batas basi: versi di database dicek paling lama setiap sekian detik
+SUPPLY_CACHE_MAX_STALENESS = float(os.environ.get("SUPPLY_CACHE_MAX_STALENESS", 2))
+SUPPLY_CACHE_MAX_ITEMS = int(os.environ.get("SUPPLY_CACHE_MAX_ITEMS", 10000))
+
+SUPPLY_CACHE_NAME = "supply"
+PENJUALAN_CACHE_NAME = "penjualan"
+
+
+def get_version(session, nama):
+    return session.query(ModelCacheVersion.versi).filter(ModelCacheVersion.nama == nama).scalar() or 0
+
+
+def bump_version(session, nama):
+    # dijalankan di transaksi yang sama dengan perubahan data, jadi ikut rollback kalau commit gagal
+    return session.execute(text(
+        "INSERT INTO cache_version (nama, versi) VALUES (:nama, 1) "
+        "ON CONFLICT (nama) DO UPDATE SET versi = cache_version.versi + 1 "
+        "RETURNING versi"
+    ), {"nama": nama}).scalar()
+
+
+def _to_dict(obj):
+    return {column.name: getattr(obj, column.name) for column in obj.__table__.columns}
+
+
+class SupplyCatalogCache:
+    """Snapshot tabel supply per worker, diindeks menurut id_produk, jenis dan status.
+
+    Kalau jumlah supply melebihi max_items, cache turun ke mode LRU per id_produk
+    dan query daftar supply kembali ke database.
+    """
+
+    def __init__(self, max_items=SUPPLY_CACHE_MAX_ITEMS, max_staleness=SUPPLY_CACHE_MAX_STALENESS):
+        self.max_items = max_items
+        self.max_staleness = max_staleness
+        self.version = None
+        self.checked_at = 0.0
+        self.complete = False
+        self.items = OrderedDict()
+        self.by_jenis = {}
+        self.by_status = {}
+        self.metrics = {
+            "hits": 0,
+            "misses": 0,
+            "reloads": 0,
+            "evictions": 0,
+            "version_checks": 0,
+        }
+
+    def invalidate(self):
+        self.version = None
+        self.complete = False
+        self.items.clear()
+        self.by_jenis = {}
+        self.by_status = {}
+
+    def _refresh(self, session):
+        now = time.monotonic()
+        if self.version is not None and now - self.checked_at < self.max_staleness:
+            return
+        self.metrics["version_checks"] += 1
+        current = get_version(session, SUPPLY_CACHE_NAME)
+        self.checked_at = now
+        if current == self.version:
+            return
+
+        # versi dibaca sebelum data, jadi penulisan di antaranya paling buruk memicu reload berikutnya
+        self.invalidate()
+        self.metrics["reloads"] += 1
+        self.version = current
+        total = session.query(ModelSupply).count()
+        if total > self.max_items:
+            return
+        for supply in session.query(ModelSupply).all():
+            row = _to_dict(supply)
+            self.items[row["id_produk"]] = row
+            self.by_jenis.setdefault(row["jenis"], []).append(row)
+            self.by_status.setdefault(row["status"], []).append(row)
+        self.complete = True
+
+    def get(self, session, id_produk):
+        self._refresh(session)
+        if id_produk in self.items:
+            self.metrics["hits"] += 1
+            self.items.move_to_end(id_produk)
+            return self.items[id_produk]
+        if self.complete:
+            self.metrics["hits"] += 1
+            return None
+
+        self.metrics["misses"] += 1
+        supply = session.query(ModelSupply).filter(ModelSupply.id_produk == id_produk).first()
+        if supply is None:
+            return None
+        row = _to_dict(supply)
+        self.items[id_produk] = row
+        if len(self.items) > self.max_items:
+            self.items.popitem(last=False)
+            self.metrics["evictions"] += 1
+        return row
+
+    def get_many(self, session, ids):
+        """Mengembalikan None kalau snapshot tidak lengkap, pemanggil harus query ke database."""
+        self._refresh(session)
+        if not self.complete:
+            self.metrics["misses"] += 1
+            return None
+        self.metrics["hits"] += 1
+        return {id_produk: self.items[id_produk] for id_produk in ids if id_produk in self.items}
+
+    def list(self, session, jenis=None, status=None):
+        """Mengembalikan None kalau snapshot tidak lengkap, pemanggil harus query ke database."""
+        self._refresh(session)
+        if not self.complete:
+            self.metrics["misses"] += 1
+            return None
+        self.metrics["hits"] += 1
+        if jenis is not None and status is not None:
+            return [row for row in self.by_jenis.get(jenis, []) if row["status"] == status]
+        if jenis is not None:
+            return list(self.by_jenis.get(jenis, []))
+        if status is not None:
+            return list(self.by_status.get(status, []))
+        return list(self.items.values())
+
+    def snapshot(self):
+        metrics = dict(self.metrics)
+        lookups = metrics["hits"] + metrics["misses"]
+        metrics["hit_rate"] = metrics["hits"] / lookups if lookups else 0
+        metrics["enabled"] = SUPPLY_CACHE_ENABLED
+        metrics["version"] = self.version
+        metrics["complete"] = self.complete
+        metrics["size"] = len(self.items)
+        return metrics
+
+
+supply_cache = SupplyCatalogCache()
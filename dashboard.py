@@ -0,0 +1,94 @@
+import os
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import text
+
+DASHBOARD_CACHE_TTL = float(os.environ.get("DASHBOARD_CACHE_TTL", 30))
+
+SUMMARY_QUERY = text("""
+    WITH stok_cte AS (
+        SELECT COUNT(*) FILTER (WHERE status = 'Unavailable') AS stock_out, COUNT(*) AS total_supply
+        FROM supply
+    ), produksi_cte AS (
+        SELECT COALESCE(json_object_agg(status_produksi, jumlah), '{}'::json) AS produksi_per_status
+        FROM (SELECT status_produksi, COUNT(*) AS jumlah FROM produksi GROUP BY status_produksi) per_status
+    ), penjualan_cte AS (
+        SELECT COALESCE(SUM(pendapatan), 0) AS pendapatan, COUNT(*) AS jumlah_transaksi
+        FROM penjualan
+        WHERE waktu_penjualan >= :revenue_start AND waktu_penjualan < :revenue_end
+    ), pembeli_cte AS (
+        SELECT COUNT(*) AS pembeli_baru
+        FROM pembeli
+        WHERE time_created >= :buyers_start AND time_created < :buyers_end
+    )
+    SELECT * FROM stok_cte, produksi_cte, penjualan_cte, pembeli_cte
+""")
+
+
+def _start_of_day(day):
+    return datetime(day.year, day.month, day.day, tzinfo=timezone.utc)
+
+
+def summary_ranges(start=None, end=None, today=None):
+    """Tanpa parameter: pendapatan hari ini dan pembeli baru minggu ini (UTC), end bersifat inklusif."""
+    if today is None:
+        today = datetime.now(timezone.utc).date()
+    if start is not None or end is not None:
+        if start is not None and end is not None and end < start:
+            raise ValueError("End date must not be before start date")
+        if end is None and start > today:
+            raise ValueError("Start date must not be after today")
+        range_start = _start_of_day(start or end or today)
+        range_end = _start_of_day(end or today) + timedelta(days=1)
+        return (range_start, range_end), (range_start, range_end)
+
+    today_start = _start_of_day(today)
+    tomorrow = today_start + timedelta(days=1)
+    week_start = today_start - timedelta(days=today.weekday())
+    return (today_start, tomorrow), (week_start, tomorrow)
+
+
+class DashboardSummaryCache:
+    def __init__(self, ttl=DASHBOARD_CACHE_TTL):
+        self.ttl = ttl
+        self.entries = {}
+
+    def get(self, session, start=None, end=None):
+        revenue_range, buyers_range = summary_ranges(start, end)
+        key = (revenue_range, buyers_range)
+        now = time.monotonic()
+        cached = self.entries.get(key)
+        if cached is not None and now - cached[0] < self.ttl:
+            return cached[1]
+
+        row = session.execute(SUMMARY_QUERY, {
+            "revenue_start": revenue_range[0],
+            "revenue_end": revenue_range[1],
+            "buyers_start": buyers_range[0],
+            "buyers_end": buyers_range[1]
+        }).mappings().one()
+        summary = {
+            "stock_out": row["stock_out"],
+            "total_supply": row["total_supply"],
+            "produksi_per_status": row["produksi_per_status"],
+            "pendapatan": {
+                "dari": revenue_range[0].date(),
+                "sampai": (revenue_range[1] - timedelta(days=1)).date(),
+                "total": row["pendapatan"],
+                "jumlah_transaksi": row["jumlah_transaksi"]
+            },
+            "pembeli_baru": {
+                "dari": buyers_range[0].date(),
+                "sampai": (buyers_range[1] - timedelta(days=1)).date(),
+                "total": row["pembeli_baru"]
+            }
+        }
+
+        # entri kedaluwarsa dibuang supaya rentang tanggal yang jarang dipakai tidak menumpuk
+        self.entries = {k: v for k, v in self.entries.items() if now - v[0] < self.ttl}
+        self.entries[key] = (now, summary)
+        return summary
+
+
+dashboard_cache = DashboardSummaryCache()
@@ -0,0 +1,11 @@
+import os
+
+from dotenv import load_dotenv
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+load_dotenv(".env")
+
+# engine untuk pekerjaan di luar request (background task), request biasa tetap memakai db.session
+engine = create_engine(os.environ["DATABASE_URL"], pool_pre_ping=True)
+SessionLocal = sessionmaker(bind=engine, autoflush=False)
@@ -0,0 +1,137 @@
+import os
+import math
+from datetime import datetime, time, timedelta, timezone
+
+import numpy as np
+from sqlalchemy import text
+
+from cache import get_version, PENJUALAN_CACHE_NAME
+
+FORECAST_HISTORY_DAYS = int(os.environ.get("FORECAST_HISTORY_DAYS", 730))
+FORECAST_ALPHA = float(os.environ.get("FORECAST_ALPHA", 0.3))
+FORECAST_MOVING_AVERAGE_DAYS = int(os.environ.get("FORECAST_MOVING_AVERAGE_DAYS", 28))
+
+
+def fetch_daily_sales(session, start, days):
+    """Satu query agregat per (produk, hari), dikembalikan sebagai matriks produk x hari."""
+    start_at = datetime.combine(start, time.min, tzinfo=timezone.utc)
+    rows = session.execute(text(
+        "SELECT id_produk, (waktu_penjualan AT TIME ZONE 'UTC')::date - (CAST(:start AS timestamptz) AT TIME ZONE 'UTC')::date, SUM(jumlah_penjualan) "
+        "FROM penjualan "
+        "WHERE id_produk IS NOT NULL AND waktu_penjualan >= :start AND waktu_penjualan < :end "
+        "GROUP BY 1, 2"
+    ), {"start": start_at, "end": start_at + timedelta(days=days)}).fetchall()
+
+    if not rows:
+        return np.array([], dtype=object), np.zeros((0, days))
+
+    id_produk, hari, jumlah = zip(*rows)
+    products, product_index = np.unique(np.array(id_produk, dtype=object), return_inverse=True)
+    sales = np.zeros((len(products), days))
+    sales[product_index, np.array(hari, dtype=np.int64)] = np.array(jumlah, dtype=np.float64)
+    return products, sales
+
+
+def weekly_seasonality(sales, weekdays):
+    """Indeks musiman per hari dalam seminggu untuk setiap produk, rata-rata indeks = 1."""
+    onehot = np.zeros((sales.shape[1], 7))
+    onehot[np.arange(sales.shape[1]), weekdays] = 1
+    counts = onehot.sum(axis=0)
+    per_weekday = np.divide(sales @ onehot, counts, out=np.zeros((sales.shape[0], 7)), where=counts > 0)
+    overall = sales.mean(axis=1, keepdims=True)
+    return np.divide(per_weekday, overall, out=np.ones_like(per_weekday), where=overall > 0)
+
+
+def exponential_smoothing_level(series, alpha):
+    """Level terakhir simple exponential smoothing untuk semua baris sekaligus.
+
+    l_t = alpha * y_t + (1 - alpha) * l_(t-1) dengan l_0 = y_0, ditulis sebagai satu perkalian bobot.
+    """
+    length = series.shape[1]
+    weights = alpha * (1 - alpha) ** np.arange(length - 1, -1, -1, dtype=np.float64)
+    weights[0] = (1 - alpha) ** (length - 1)
+    return series @ weights
+
+
+def forecast_demand(sales, start, horizon, alpha=FORECAST_ALPHA, moving_average_days=FORECAST_MOVING_AVERAGE_DAYS):
+    days = sales.shape[1]
+    weekdays = (start.weekday() + np.arange(days)) % 7
+    future_weekdays = (start.weekday() + days + np.arange(horizon)) % 7
+
+    # seasonality baru dipakai kalau histori minimal dua minggu
+    if days >= 14:
+        seasonal = weekly_seasonality(sales, weekdays)
+    else:
+        seasonal = np.ones((sales.shape[0], 7))
+
+    history_seasonal = seasonal[:, weekdays]
+    # hari dengan indeks 0 (misalnya tidak pernah laku di hari Minggu) tidak memberi informasi level,
+    # jadi diisi rata-rata baris supaya tidak menarik level ke bawah
+    mean = np.broadcast_to(sales.mean(axis=1, keepdims=True), sales.shape)
+    deseasonalized = np.divide(sales, history_seasonal, out=mean.copy(), where=history_seasonal > 0)
+    level = exponential_smoothing_level(deseasonalized, alpha)
+
+    window = sales[:, -moving_average_days:]
+    return {
+        "forecast": level * seasonal[:, future_weekdays].sum(axis=1),
+        "moving_average": window.mean(axis=1) * horizon,
+        "daily_std": window.std(axis=1),
+    }
+
+
+class ReorderForecastCache:
+    """Hasil forecast per worker per (hari, horizon).
+
+    Histori hanya sampai kemarin dan waktu_penjualan diisi server, jadi penjualan baru tidak
+    mengubah forecast hari ini. Versi penjualan hanya dinaikkan saat data lama diubah atau dihapus.
+    """
+
+    def __init__(self):
+        self.version = None
+        self.results = {}
+
+    def get(self, session, horizon):
+        current = get_version(session, PENJUALAN_CACHE_NAME)
+        today = datetime.now(timezone.utc).date()
+        if current != self.version:
+            self.version = current
+            self.results = {}
+        else:
+            self.results = {key: value for key, value in self.results.items() if key[0] == today}
+
+        key = (today, horizon)
+        if key not in self.results:
+            start = today - timedelta(days=FORECAST_HISTORY_DAYS)
+            products, sales = fetch_daily_sales(session, start, FORECAST_HISTORY_DAYS)
+            demand = forecast_demand(sales, start, horizon)
+            self.results[key] = {
+                id_produk: {name: float(values[i]) for name, values in demand.items()}
+                for i, id_produk in enumerate(products)
+            }
+        return self.results[key]
+
+
+def reorder_suggestions(supplies, forecasts, horizon, safety_factor):
+    suggestions = []
+    for supply in supplies:
+        demand = forecasts.get(supply["id_produk"])
+        if demand is None:
+            continue
+        safety_stock = safety_factor * demand["daily_std"] * math.sqrt(horizon)
+        reorder = math.ceil(demand["forecast"] + safety_stock - supply["jumlah"])
+        if reorder <= 0:
+            continue
+        suggestions.append({
+            "id_produk": supply["id_produk"],
+            "nama_produk": supply["nama_produk"],
+            "jumlah": supply["jumlah"],
+            "forecast": round(demand["forecast"], 2),
+            "moving_average": round(demand["moving_average"], 2),
+            "safety_stock": round(safety_stock, 2),
+            "reorder": reorder
+        })
+    suggestions.sort(key=lambda suggestion: suggestion["reorder"], reverse=True)
+    return suggestions
+
+
+reorder_forecast_cache = ReorderForecastCache()
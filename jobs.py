@@ -0,0 +1,219 @@
+import os
+import time
+import uuid
+import logging
+import threading
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import select, func, or_, and_
+
+from database import SessionLocal
+from cache import bump_version, SUPPLY_CACHE_NAME, PENJUALAN_CACHE_NAME
+from models import Supply as ModelSupply
+from models import Produksi as ModelProduksi
+from models import Penjualan as ModelPenjualan
+from models import Pembeli as ModelPembeli
+from models import Job as ModelJob
+
+logger = logging.getLogger(__name__)
+
+JOB_WORKERS = int(os.environ.get("JOB_WORKERS", 2))
+JOB_POLL_INTERVAL = float(os.environ.get("JOB_POLL_INTERVAL", 1))
+JOB_DELETE_CHUNK_SIZE = int(os.environ.get("JOB_DELETE_CHUNK_SIZE", 1000))
+# job "Running" yang tidak di-update selama ini dianggap ditinggal worker yang mati
+JOB_STALE_SECONDS = int(os.environ.get("JOB_STALE_SECONDS", 600))
+
+JOB_STATUS_QUEUED = "Queued"
+JOB_STATUS_RUNNING = "Running"
+JOB_STATUS_DONE = "Done"
+JOB_STATUS_FAILED = "Failed"
+JOB_STATUS_CANCELLED = "Cancelled"
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class JobContext:
+    """Diberikan ke handler job untuk melaporkan progress dan mengecek pembatalan."""
+
+    def __init__(self, session, job):
+        self.session = session
+        self.job = job
+
+    def set_progress(self, done, total):
+        progress = 100 if total == 0 else min(100, int(done * 100 / total))
+        self.job.progress = progress
+        # heartbeat untuk pengecekan job basi di claim_job; di-set eksplisit karena SQLAlchemy
+        # tidak mengirim UPDATE (dan onupdate tidak jalan) kalau progress tidak berubah
+        self.job.time_updated = func.now()
+        self.session.commit()
+        self.session.refresh(self.job)
+        if self.job.cancel_requested:
+            raise JobCancelled()
+
+
+def _delete_all(model, cache_name=None):
+    table = model.__table__
+    pk = list(table.primary_key.columns)[0]
+
+    def handler(session, ctx, parameter):
+        total = session.execute(select(func.count()).select_from(table)).scalar()
+        deleted = 0
+        while True:
+            chunk = select(pk).limit(JOB_DELETE_CHUNK_SIZE).scalar_subquery()
+            result = session.execute(table.delete().where(pk.in_(chunk)))
+            if result.rowcount == 0:
+                break
+            deleted += result.rowcount
+            if cache_name is not None:
+                bump_version(session, cache_name)
+            ctx.set_progress(deleted, total)
+        session.commit()
+        return {"deleted": deleted}
+
+    return handler
+
+
+JOB_HANDLERS = {
+    "delete_supplies": _delete_all(ModelSupply, SUPPLY_CACHE_NAME),
+    "delete_productions": _delete_all(ModelProduksi),
+    "delete_penjualan": _delete_all(ModelPenjualan, PENJUALAN_CACHE_NAME),
+    "delete_buyers": _delete_all(ModelPembeli),
+}
+
+
+def create_job(session, jenis_job, parameter=None, id_username=None):
+    if jenis_job not in JOB_HANDLERS:
+        raise ValueError(f"Unknown job type: {jenis_job}")
+    job = ModelJob(
+        id_job=str(uuid.uuid4()),
+        jenis_job=jenis_job,
+        parameter=parameter,
+        id_username=id_username
+    )
+    session.add(job)
+    session.commit()
+    return job
+
+
+def cancel_job(session, id_job):
+    # UPDATE bersyarat: kalau worker sudah mengklaim job di antara baca dan tulis,
+    # status Running tidak ditimpa dan pembatalan diteruskan lewat cancel_requested
+    cancelled = session.query(ModelJob).filter(
+        ModelJob.id_job == id_job,
+        ModelJob.status == JOB_STATUS_QUEUED
+    ).update({
+        ModelJob.status: JOB_STATUS_CANCELLED,
+        ModelJob.time_finished: func.now()
+    }, synchronize_session=False)
+    if cancelled == 0:
+        session.query(ModelJob).filter(
+            ModelJob.id_job == id_job,
+            ModelJob.status == JOB_STATUS_RUNNING
+        ).update({ModelJob.cancel_requested: True}, synchronize_session=False)
+    session.commit()
+    return session.query(ModelJob).filter(ModelJob.id_job == id_job).first()
+
+
+def claim_job(session):
+    # SKIP LOCKED: worker lain (thread atau worker gunicorn lain) langsung melewati baris yang sedang diklaim
+    stale_before = datetime.now(timezone.utc) - timedelta(seconds=JOB_STALE_SECONDS)
+    job = session.query(ModelJob).filter(or_(
+        ModelJob.status == JOB_STATUS_QUEUED,
+        and_(
+            ModelJob.status == JOB_STATUS_RUNNING,
+            func.coalesce(ModelJob.time_updated, ModelJob.time_started) < stale_before
+        )
+    )).order_by(ModelJob.time_created).with_for_update(skip_locked=True).first()
+
+    if job is None:
+        session.rollback()
+        return None
+
+    if job.status == JOB_STATUS_RUNNING and job.cancel_requested:
+        # worker lama mati setelah pembatalan diminta, jangan dijalankan ulang
+        job.status = JOB_STATUS_CANCELLED
+        job.time_finished = func.now()
+        session.commit()
+        return None
+
+    job.status = JOB_STATUS_RUNNING
+    job.progress = 0
+    job.time_started = func.now()
+    session.commit()
+    return job
+
+
+def run_job(session, job):
+    handler = JOB_HANDLERS.get(job.jenis_job)
+    try:
+        if handler is None:
+            raise ValueError(f"Unknown job type: {job.jenis_job}")
+        hasil = handler(session, JobContext(session, job), job.parameter or {})
+        job.status = JOB_STATUS_DONE
+        job.progress = 100
+        job.hasil = hasil
+    except JobCancelled:
+        session.rollback()
+        job.status = JOB_STATUS_CANCELLED
+    except Exception as e:
+        logger.exception("Job %s failed", job.id_job)
+        session.rollback()
+        job.status = JOB_STATUS_FAILED
+        job.error = str(e)
+    job.time_finished = func.now()
+    session.commit()
+
+
+class JobWorkerPool:
+    def __init__(self, workers=JOB_WORKERS, poll_interval=JOB_POLL_INTERVAL):
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.stop_event = threading.Event()
+        self.threads = []
+
+    def start(self):
+        self.stop_event.clear()
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f"job-worker-{i}", daemon=True)
+            thread.start()
+            self.threads.append(thread)
+
+    def stop(self, timeout=None):
+        # job yang sedang berjalan diselesaikan dulu, job baru tidak diklaim lagi;
+        # timeout berlaku untuk semua thread sekaligus, bukan per thread
+        self.stop_event.set()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for thread in self.threads:
+            thread.join(None if deadline is None else max(0, deadline - time.monotonic()))
+        self.threads = []
+
+    def _run(self):
+        while not self.stop_event.is_set():
+            session = SessionLocal()
+            try:
+                job = claim_job(session)
+                if job is not None:
+                    run_job(session, job)
+                    continue
+            except Exception:
+                logger.exception("Job worker error")
+                session.rollback()
+            finally:
+                session.close()
+            self.stop_event.wait(self.poll_interval)
+
+
+job_workers = JobWorkerPool()
+
+
+if __name__ == "__main__":
+    # menjalankan worker terpisah dari API: python jobs.py
+    logging.basicConfig(level=logging.INFO)
+    job_workers.start()
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        job_workers.stop()
@@ -1,16 +1,19 @@
 import os
 import asyncio
 
-from typing import Optional
-from fastapi import FastAPI, HTTPException, Depends, status
+from typing import Optional, List
+from fastapi import FastAPI, HTTPException, Depends, Query, status
 from fastapi import FastAPI, HTTPException, status
 from fastapi_sqlalchemy import DBSessionMiddleware, db
+from sqlalchemy import any_, bindparam, String
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.exc import IntegrityError
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from dotenv import load_dotenv
 from pydantic import BaseModel
 from passlib.context import CryptContext
 from jose import JWTError, jwt
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 
 from schema import Supply as SchemaSupply
 from schema import Produksi as SchemaProduksi
@@ -21,12 +24,23 @@ from schema import User as SchemaUser
 from schema import SupplyUpdate as SchemaSupplyUpdate
 from schema import PenjualanUpdate as SchemaPenjualanUpdate
 from schema import PembeliUpdate as SchemaPembeliUpdate
+from schema import JobCreate as SchemaJobCreate
+from schema import Job as SchemaJob
+from schema import IdList as SchemaIdList
 
 from models import Supply as ModelSupply
 from models import Produksi as ModelProduksi
 from models import Penjualan as ModelPenjualan
 from models import Pembeli as ModelPembeli
 from models import User as ModelUser
+from models import Job as ModelJob
+
+from batching import penjualan_batcher, BatchQueueFull, DuplicatePenjualan, PENJUALAN_BATCH_ENABLED
+from cache import supply_cache, bump_version, SUPPLY_CACHE_ENABLED, SUPPLY_CACHE_NAME, PENJUALAN_CACHE_NAME
+from forecast import reorder_forecast_cache, reorder_suggestions
+from dashboard import dashboard_cache
+from multiget import split_ids, order_by_ids
+from jobs import job_workers, create_job, cancel_job, JOB_WORKERS
 
 load_dotenv(".env")
 
@@ -49,6 +63,19 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 app = FastAPI()
 app.add_middleware(DBSessionMiddleware, db_url= os.environ["DATABASE_URL"])
 
+@app.on_event("startup")
+async def start_background_workers():
+    if PENJUALAN_BATCH_ENABLED:
+        penjualan_batcher.start()
+    if JOB_WORKERS > 0:
+        job_workers.start()
+
+@app.on_event("shutdown")
+async def stop_background_workers():
+    await penjualan_batcher.stop()
+    # join thread dijalankan di executor supaya event loop tidak terblokir, di bawah graceful timeout gunicorn (30 detik)
+    await asyncio.get_running_loop().run_in_executor(None, job_workers.stop, 20)
+
 def verify_password(plain_password, hashed_password):
     return pwd_context.verify(plain_password, hashed_password)
 
@@ -107,6 +134,18 @@ async def get_current_active_user(current_user: SchemaUser = Depends(get_current
         raise HTTPException(status_code=400, detail="Inactive user")
     return current_user
 
+def parse_ids(ids: List[str]):
+    try:
+        return split_ids(ids)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+def get_many(model, primary_key, ids: List[str], found=None):
+    if found is None:
+        rows = db.session.query(model).filter(primary_key == any_(bindparam("ids", ids, type_=ARRAY(String)))).all()
+        found = {getattr(row, primary_key.key): row for row in rows}
+    return order_by_ids(ids, found)
+
 @app.post("/login", response_model=Token)
 async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends()):
     user = await asyncio.gather(authenticate_user(form_data.username, form_data.password))
@@ -133,17 +172,53 @@ async def landing():
         "message": "Server Successfully runnning"
     }
 
+# API bagian dashboard
+@app.get("/dashboard/summary")
+async def get_dashboard_summary(start: Optional[date] = None, end: Optional[date] = None, current_user = Depends(get_current_active_user)):
+    try:
+        return dashboard_cache.get(db.session, start, end)
+    except ValueError as e:
+        raise HTTPException(status_code = status.HTTP_400_BAD_REQUEST, detail=str(e))
+
 # API bagian Supply
 @app.get("/supply")
-async def get_all_supplies(current_user = Depends(get_current_active_user)):
-    supplies = db.session.query(ModelSupply).all()
+async def get_all_supplies(jenis: Optional[str] = None, status_supply: Optional[str] = Query(None, alias="status"), ids: Optional[List[str]] = Query(None), current_user = Depends(get_current_active_user)):
+    if ids is not None:
+        if jenis is not None or status_supply is not None:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="ids cannot be combined with jenis or status")
+        return await get_supplies_by_ids(SchemaIdList(ids=ids), current_user)
+    supplies = supply_cache.list(db.session, jenis, status_supply) if SUPPLY_CACHE_ENABLED else None
+    if supplies is None:
+        query = db.session.query(ModelSupply)
+        if jenis is not None:
+            query = query.filter(ModelSupply.jenis == jenis)
+        if status_supply is not None:
+            query = query.filter(ModelSupply.status == status_supply)
+        supplies = query.all()
     if len(supplies) < 1:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No Supplies were found")
     return supplies
 
+@app.post("/supply/lookup")
+async def get_supplies_by_ids(body: SchemaIdList, current_user = Depends(get_current_active_user)):
+    ids = parse_ids(body.ids)
+    found = supply_cache.get_many(db.session, ids) if SUPPLY_CACHE_ENABLED else None
+    return get_many(ModelSupply, ModelSupply.id_produk, ids, found)
+
+@app.get("/supply/reorder-suggestions")
+async def get_reorder_suggestions(horizon: int = Query(14, ge=1, le=365), safety_factor: float = Query(1.65, ge=0), current_user = Depends(get_current_active_user)):
+    forecasts = reorder_forecast_cache.get(db.session, horizon)
+    supplies = supply_cache.list(db.session) if SUPPLY_CACHE_ENABLED else None
+    if supplies is None:
+        supplies = [row._asdict() for row in db.session.query(ModelSupply.id_produk, ModelSupply.nama_produk, ModelSupply.jumlah)]
+    return reorder_suggestions(supplies, forecasts, horizon, safety_factor)
+
 @app.get("/supply/{supply_id}")
 async def get_a_supply(supply_id:str, current_user = Depends(get_current_active_user)):
-    found_supply = db.session.query(ModelSupply).filter(ModelSupply.id_produk == supply_id).first()
+    if SUPPLY_CACHE_ENABLED:
+        found_supply = supply_cache.get(db.session, supply_id)
+    else:
+        found_supply = db.session.query(ModelSupply).filter(ModelSupply.id_produk == supply_id).first()
     if found_supply is None:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Supply not found")
     return found_supply
@@ -160,7 +235,9 @@ async def add_supply(supply: SchemaSupply, current_user = Depends(get_current_ac
     )
 
     db.session.add(db_supply)
+    bump_version(db.session, SUPPLY_CACHE_NAME)
     db.session.commit()
+    supply_cache.invalidate()
 
     return db_supply
 
@@ -176,7 +253,9 @@ async def update_supply(supply_id: str, supply: SchemaSupplyUpdate, current_user
     supply_to_update.jenis = supply.jenis
     supply_to_update.status = "Unavailable" if  supply.jumlah < 1 else ("Available" if supply.jumlah >= 1 else supply.jumlah)
 
+    bump_version(db.session, SUPPLY_CACHE_NAME)
     db.session.commit()
+    supply_cache.invalidate()
 
     return supply_to_update
 
@@ -187,7 +266,9 @@ async def delete_a_supply(supply_id: str, current_user = Depends(get_current_act
         raise HTTPException(status_code = status.HTTP_404_NOT_FOUND, detail = "Supply not found")
 
     db.session.delete(supply_to_delete)
+    bump_version(db.session, SUPPLY_CACHE_NAME)
     db.session.commit()
+    supply_cache.invalidate()
 
     return {
         "message" : f"Supply {supply_id} successfully deleted"
@@ -202,7 +283,9 @@ async def delete_supplies(current_user = Depends(get_current_active_user)):
 
     for supply in supplies:
         db.session.delete(supply)
+        bump_version(db.session, SUPPLY_CACHE_NAME)
         db.session.commit()
+    supply_cache.invalidate()
 
     return {
         "message" : "All supplies successfully deleted"
@@ -210,12 +293,18 @@ async def delete_supplies(current_user = Depends(get_current_active_user)):
 
 # API bagian Produksi
 @app.get("/production")
-async def get_all_productions(current_user = Depends(get_current_active_user)):
+async def get_all_productions(ids: Optional[List[str]] = Query(None), current_user = Depends(get_current_active_user)):
+    if ids is not None:
+        return get_many(ModelProduksi, ModelProduksi.id_produksi, parse_ids(ids))
     productions = db.session.query(ModelProduksi).all()
     if len(productions) < 1:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No Productions were found")
     return productions
 
+@app.post("/production/lookup")
+async def get_productions_by_ids(body: SchemaIdList, current_user = Depends(get_current_active_user)):
+    return get_many(ModelProduksi, ModelProduksi.id_produksi, parse_ids(body.ids))
+
 @app.get("/production/{production_id}")
 async def get_a_production(production_id:str, current_user = Depends(get_current_active_user)):
     found_production = db.session.query(ModelProduksi).filter(ModelProduksi.id_produksi == production_id).first()
@@ -269,12 +358,18 @@ async def delete_production(production_id: str, current_user = Depends(get_curre
 
 # API bagian Penjualan
 @app.get("/penjualan")
-async def get_all_sellings(current_user = Depends(get_current_active_user)):
+async def get_all_sellings(ids: Optional[List[str]] = Query(None), current_user = Depends(get_current_active_user)):
+    if ids is not None:
+        return get_many(ModelPenjualan, ModelPenjualan.id_transaksi, parse_ids(ids))
     sellings = db.session.query(ModelPenjualan).all()
     if len(sellings) < 1:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No Sellings were found")
     return sellings
 
+@app.post("/penjualan/lookup")
+async def get_sellings_by_ids(body: SchemaIdList, current_user = Depends(get_current_active_user)):
+    return get_many(ModelPenjualan, ModelPenjualan.id_transaksi, parse_ids(body.ids))
+
 @app.get("/penjualan/{selling_id}")
 async def get_a_selling(selling_id:str, current_user = Depends(get_current_active_user)):
     found_selling = db.session.query(ModelPenjualan).filter(ModelPenjualan.id_transaksi == selling_id).first()
@@ -282,17 +377,38 @@ async def get_a_selling(selling_id:str, current_user = Depends(get_current_activ
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Selling not found")
     return found_selling
 
+def penjualan_integrity_error(e: IntegrityError):
+    # 23503 = foreign_key_violation, id_produk tidak ada di tabel supply
+    if getattr(e.orig, "pgcode", None) == "23503":
+        return HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Product ID Not found")
+    return HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Penjualan could not be saved")
+
 @app.post("/penjualan", response_model = SchemaPenjualan, status_code = status.HTTP_201_CREATED)
 async def add_penjualan(penjualan: SchemaPenjualan, current_user = Depends(get_current_active_user)):
+    if PENJUALAN_BATCH_ENABLED:
+        try:
+            return await penjualan_batcher.submit(penjualan.dict())
+        except BatchQueueFull as e:
+            raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
+        except DuplicatePenjualan:
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Penjualan could not be saved")
+        except IntegrityError as e:
+            raise penjualan_integrity_error(e)
+
     db_penjualan = ModelPenjualan(
         id_transaksi=penjualan.id_transaksi,
         jumlah_penjualan=penjualan.jumlah_penjualan,
         pendapatan=penjualan.pendapatan,
-        status=penjualan.status
+        status=penjualan.status,
+        id_produk=penjualan.id_produk
     )
 
-    db.session.add(db_penjualan)
-    db.session.commit()
+    try:
+        db.session.add(db_penjualan)
+        db.session.commit()
+    except IntegrityError as e:
+        db.session.rollback()
+        raise penjualan_integrity_error(e)
 
     return db_penjualan
 
@@ -307,6 +423,7 @@ async def update_penjualan(selling_id: str, penjualan: SchemaPenjualanUpdate, cu
     penjualan_to_update.pendapatan = penjualan.pendapatan
     penjualan_to_update.status = penjualan.status
 
+    bump_version(db.session, PENJUALAN_CACHE_NAME)
     db.session.commit()
 
     return penjualan_to_update
@@ -319,6 +436,7 @@ async def delete_a_penjualan(selling_id: str, current_user = Depends(get_current
         raise HTTPException(status_code = status.HTTP_404_NOT_FOUND, detail = "Penjualan not found")
 
     db.session.delete(penjualan_to_delete)
+    bump_version(db.session, PENJUALAN_CACHE_NAME)
     db.session.commit()
 
     return {
@@ -334,21 +452,36 @@ async def delete_penjualan(current_user = Depends(get_current_active_user)):
 
     for item in penjualan:
         db.session.delete(item)
+        bump_version(db.session, PENJUALAN_CACHE_NAME)
         db.session.commit()
 
     return {
         "message" : "All sellings successfully deleted"
     }
 
+@app.get("/metrics/penjualan-batch")
+async def get_penjualan_batch_metrics(current_user = Depends(get_current_active_user)):
+    return penjualan_batcher.snapshot()
+
+@app.get("/metrics/supply-cache")
+async def get_supply_cache_metrics(current_user = Depends(get_current_active_user)):
+    return supply_cache.snapshot()
+
 
 # API bagian pembeli
 @app.get("/pembeli")
-async def get_all_buyers(current_user = Depends(get_current_active_user)):
+async def get_all_buyers(ids: Optional[List[str]] = Query(None), current_user = Depends(get_current_active_user)):
+    if ids is not None:
+        return get_many(ModelPembeli, ModelPembeli.id_pembeli, parse_ids(ids))
     buyers = db.session.query(ModelPembeli).all()
     if len(buyers) < 1:
         raise HTTPException(status_code = status.HTTP_404_NOT_FOUND, detail="No Buyers were found")
     return buyers
 
+@app.post("/pembeli/lookup")
+async def get_buyers_by_ids(body: SchemaIdList, current_user = Depends(get_current_active_user)):
+    return get_many(ModelPembeli, ModelPembeli.id_pembeli, parse_ids(body.ids))
+
 @app.get("/pembeli/{buyer_id}")
 async def get_a_buyer(buyer_id:str, current_user = Depends(get_current_active_user)):
     found_buyer = db.session.query(ModelPembeli).filter(ModelPembeli.id_pembeli == buyer_id).first()
@@ -449,4 +582,27 @@ async def add_user(user: SchemaUser, current_user = Depends(get_current_active_u
     db.session.add(db_user)
     db.session.commit()
 
-    return db_user
\ No newline at end of file
+    return db_user
+
+
+# API bagian job
+@app.post("/jobs", response_model = SchemaJob, status_code = status.HTTP_202_ACCEPTED)
+async def add_job(job: SchemaJobCreate, current_user = Depends(get_current_active_user)):
+    try:
+        return create_job(db.session, job.jenis_job, job.parameter, current_user.id_username)
+    except ValueError as e:
+        raise HTTPException(status_code = status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+@app.get("/jobs/{job_id}", response_model = SchemaJob)
+async def get_a_job(job_id: str, current_user = Depends(get_current_active_user)):
+    found_job = db.session.query(ModelJob).filter(ModelJob.id_job == job_id).first()
+    if found_job is None:
+        raise HTTPException(status_code = status.HTTP_404_NOT_FOUND, detail="Job not found")
+    return found_job
+
+@app.post("/jobs/{job_id}/cancel", response_model = SchemaJob)
+async def cancel_a_job(job_id: str, current_user = Depends(get_current_active_user)):
+    cancelled_job = cancel_job(db.session, job_id)
+    if cancelled_job is None:
+        raise HTTPException(status_code = status.HTTP_404_NOT_FOUND, detail="Job not found")
+    return cancelled_job
\ No newline at end of file
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Text, Integer, DateTime, ForeignKey, Boolean
+from sqlalchemy import Column, String, Text, Integer, BigInteger, DateTime, ForeignKey, Boolean, JSON
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
@@ -36,6 +36,7 @@ class Penjualan(Base):
     status = Column(String(10), nullable=False, server_default="Processed")
     waktu_penjualan = Column(DateTime(timezone=True), server_default=func.now())
     waktu_pengiriman = Column(DateTime(timezone=True), onupdate= func.now())
+    id_produk = Column(String(8), ForeignKey("supply.id_produk", ondelete="SET NULL"), nullable=True, index=True)
 
 # model untuk tabel pembeli
 class Pembeli(Base):
@@ -60,4 +61,27 @@ class User(Base):
     role = Column(String(15), nullable=False)
     status = Column(Boolean, nullable=False, server_default="true")
     time_created = Column(DateTime(timezone=True), server_default= func.now())
-    time_updated = Column(DateTime(timezone=True), onupdate= func.now())
\ No newline at end of file
+    time_updated = Column(DateTime(timezone=True), onupdate= func.now())
+
+# Model untuk tabel job (operasi panjang yang dijalankan di background)
+class Job(Base):
+    __tablename__ = "job"
+    id_job = Column(String(36), primary_key=True, index=True)
+    jenis_job = Column(String(50), nullable=False)
+    status = Column(String(10), nullable=False, server_default="Queued", index=True)
+    parameter = Column(JSON, nullable=True)
+    progress = Column(Integer, nullable=False, server_default="0")
+    hasil = Column(JSON, nullable=True)
+    error = Column(Text, nullable=True)
+    cancel_requested = Column(Boolean, nullable=False, server_default="false")
+    id_username = Column(String(20), ForeignKey("user.id_username"), nullable=True)
+    time_created = Column(DateTime(timezone=True), server_default= func.now())
+    time_started = Column(DateTime(timezone=True), nullable=True)
+    time_finished = Column(DateTime(timezone=True), nullable=True)
+    time_updated = Column(DateTime(timezone=True), onupdate= func.now())
+
+# Model untuk versi cache, dinaikkan setiap ada perubahan data supaya semua worker tahu cache-nya basi
+class CacheVersion(Base):
+    __tablename__ = "cache_version"
+    nama = Column(String(50), primary_key=True)
+    versi = Column(BigInteger, nullable=False, server_default="0")
@@ -0,0 +1,27 @@
+import os
+
+MULTI_GET_MAX_IDS = int(os.environ.get("MULTI_GET_MAX_IDS", 100))
+
+
+def split_ids(ids, max_ids=MULTI_GET_MAX_IDS):
+    """Menerima ?ids=a,b,c maupun ?ids=a&ids=b, urutan request dipertahankan dan duplikat dibuang."""
+    # batas dihitung dari jumlah token mentah (termasuk duplikat) sebelum string dipecah
+    tokens = sum(value.count(",") + 1 for value in ids)
+    if tokens > max_ids:
+        raise ValueError(f"Maximum {max_ids} ids per request")
+    parsed = {}
+    for value in ids:
+        for id_ in value.split(","):
+            id_ = id_.strip()
+            if id_:
+                parsed[id_] = None
+    if not parsed:
+        raise ValueError("At least one id is required")
+    return list(parsed)
+
+
+def order_by_ids(ids, found):
+    return {
+        "found": [found[id_] for id_ in ids if id_ in found],
+        "missing": [id_ for id_ in ids if id_ not in found]
+    }
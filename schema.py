@@ -1,5 +1,6 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import Optional, Any, Dict, List
+from datetime import datetime
 
 class Supply(BaseModel):
     id_produk: str
@@ -36,6 +37,7 @@ class Penjualan(BaseModel):
     jumlah_penjualan: int
     pendapatan: int
     status: int
+    id_produk: Optional[str] = None
 
     class Config:
         orm_mode = True
@@ -79,4 +81,29 @@ class User(BaseModel):
     status: Optional[bool] = True
 
     class Config:
-        orm_mode = True
\ No newline at end of file
+        orm_mode = True
+
+class JobCreate(BaseModel):
+    jenis_job: str
+    parameter: Optional[Dict[str, Any]] = None
+
+class Job(BaseModel):
+    id_job: str
+    jenis_job: str
+    status: str
+    parameter: Optional[Dict[str, Any]] = None
+    progress: int
+    hasil: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    cancel_requested: bool
+    id_username: Optional[str] = None
+    time_created: Optional[datetime] = None
+    time_started: Optional[datetime] = None
+    time_finished: Optional[datetime] = None
+
+    class Config:
+        orm_mode = True
+
+
+class IdList(BaseModel):
+    ids: List[str]
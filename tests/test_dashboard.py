@@ -0,0 +1,44 @@
+from datetime import date, datetime, timezone
+
+import pytest
+
+from dashboard import summary_ranges
+
+# Rabu
+TODAY = date(2024, 5, 15)
+
+
+def utc(year, month, day):
+    return datetime(year, month, day, tzinfo=timezone.utc)
+
+
+def test_default_ranges_are_today_and_this_week():
+    revenue, buyers = summary_ranges(today=TODAY)
+    assert revenue == (utc(2024, 5, 15), utc(2024, 5, 16))
+    assert buyers == (utc(2024, 5, 13), utc(2024, 5, 16))
+
+
+def test_end_is_inclusive():
+    revenue, buyers = summary_ranges(date(2024, 5, 1), date(2024, 5, 10), today=TODAY)
+    assert revenue == (utc(2024, 5, 1), utc(2024, 5, 11))
+    assert buyers == revenue
+
+
+def test_start_only_runs_until_today():
+    revenue, _ = summary_ranges(start=date(2024, 5, 1), today=TODAY)
+    assert revenue == (utc(2024, 5, 1), utc(2024, 5, 16))
+
+
+def test_end_only_covers_that_day():
+    revenue, _ = summary_ranges(end=date(2024, 5, 2), today=TODAY)
+    assert revenue == (utc(2024, 5, 2), utc(2024, 5, 3))
+
+
+def test_rejects_end_before_start():
+    with pytest.raises(ValueError):
+        summary_ranges(date(2024, 5, 10), date(2024, 5, 1), today=TODAY)
+
+
+def test_rejects_start_after_today_without_end():
+    with pytest.raises(ValueError):
+        summary_ranges(start=date(2024, 5, 16), today=TODAY)
@@ -0,0 +1,102 @@
+from datetime import date
+
+import numpy as np
+import pytest
+
+import forecast
+from forecast import (
+    exponential_smoothing_level,
+    forecast_demand,
+    reorder_suggestions,
+    weekly_seasonality,
+    ReorderForecastCache
+)
+
+MONDAY = date(2024, 1, 1)
+
+
+def test_exponential_smoothing_level_matches_recursive_definition():
+    rng = np.random.default_rng(0)
+    series = rng.poisson(5, size=(3, 50)).astype(float)
+    alpha = 0.3
+
+    expected = []
+    for row in series:
+        level = row[0]
+        for value in row[1:]:
+            level = alpha * value + (1 - alpha) * level
+        expected.append(level)
+
+    assert exponential_smoothing_level(series, alpha) == pytest.approx(expected)
+
+
+def test_weekly_seasonality_averages_to_one():
+    sales = np.tile([14.0, 7, 7, 7, 7, 7, 21], 4)[np.newaxis, :]
+    weekdays = np.arange(sales.shape[1]) % 7
+    seasonal = weekly_seasonality(sales, weekdays)
+    assert seasonal[0] == pytest.approx([1.4, 0.7, 0.7, 0.7, 0.7, 0.7, 2.1])
+    assert seasonal.mean() == pytest.approx(1)
+
+
+def test_forecast_repeats_flat_weekly_pattern():
+    week = [14.0, 7, 7, 7, 7, 7, 21]
+    sales = np.tile(week, 8)[np.newaxis, :]
+    demand = forecast_demand(sales, MONDAY, horizon=7)
+    assert demand["forecast"] == pytest.approx([sum(week)])
+    assert demand["moving_average"] == pytest.approx([sum(week)])
+
+
+def test_forecast_ignores_weekdays_without_sales():
+    # hanya laku di hari Senin
+    sales = np.tile([7.0, 0, 0, 0, 0, 0, 0], 8)[np.newaxis, :]
+    demand = forecast_demand(sales, MONDAY, horizon=14)
+    assert demand["forecast"] == pytest.approx([14])
+
+
+def test_forecast_with_short_history_skips_seasonality():
+    sales = np.full((2, 7), 5.0)
+    sales[1] = 0
+    demand = forecast_demand(sales, MONDAY, horizon=10)
+    assert demand["forecast"] == pytest.approx([50, 0])
+    assert demand["moving_average"] == pytest.approx([50, 0])
+    assert demand["daily_std"] == pytest.approx([0, 0])
+
+
+def test_forecast_with_empty_history():
+    demand = forecast_demand(np.zeros((0, 730)), MONDAY, horizon=14)
+    for values in demand.values():
+        assert values.shape == (0,)
+
+
+def test_reorder_suggestions_compares_forecast_with_stock():
+    supplies = [
+        {"id_produk": "A1", "nama_produk": "Keripik", "jumlah": 10},
+        {"id_produk": "B2", "nama_produk": "Sambal", "jumlah": 100},
+        {"id_produk": "C3", "nama_produk": "Kerupuk", "jumlah": 0},
+        {"id_produk": "D4", "nama_produk": "Tanpa penjualan", "jumlah": 0},
+    ]
+    forecasts = {
+        "A1": {"forecast": 40.0, "moving_average": 38.0, "daily_std": 1.0},
+        "B2": {"forecast": 40.0, "moving_average": 38.0, "daily_std": 1.0},
+        "C3": {"forecast": 100.0, "moving_average": 90.0, "daily_std": 0.0},
+    }
+    suggestions = reorder_suggestions(supplies, forecasts, horizon=4, safety_factor=2)
+    assert [(s["id_produk"], s["reorder"]) for s in suggestions] == [("C3", 100), ("A1", 34)]
+    assert suggestions[1]["safety_stock"] == 4
+
+
+def test_forecast_cache_keeps_each_horizon(monkeypatch):
+    calls = []
+
+    def fake_fetch(session, start, days):
+        calls.append(days)
+        return np.array(["A1"], dtype=object), np.full((1, days), 2.0)
+
+    monkeypatch.setattr(forecast, "get_version", lambda session, nama: 1)
+    monkeypatch.setattr(forecast, "fetch_daily_sales", fake_fetch)
+
+    cache = ReorderForecastCache()
+    for _ in range(3):
+        assert cache.get(None, 7)["A1"]["forecast"] == pytest.approx(14)
+        assert cache.get(None, 14)["A1"]["forecast"] == pytest.approx(28)
+    assert len(calls) == 2
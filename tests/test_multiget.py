@@ -0,0 +1,33 @@
+import pytest
+
+from multiget import split_ids, order_by_ids
+
+
+def test_split_ids_keeps_request_order_and_drops_duplicates():
+    assert split_ids(["C3,A1", "B2", "A1, C3 ,D4"]) == ["C3", "A1", "B2", "D4"]
+
+
+def test_split_ids_rejects_empty_value():
+    with pytest.raises(ValueError):
+        split_ids([""])
+    with pytest.raises(ValueError):
+        split_ids([" , ,"])
+
+
+def test_split_ids_counts_duplicates_towards_limit():
+    assert split_ids(["A1,A1,A1"], max_ids=3) == ["A1"]
+    with pytest.raises(ValueError):
+        split_ids(["A1,A1,A1,A1"], max_ids=3)
+
+
+def test_split_ids_limit_spans_repeated_params():
+    with pytest.raises(ValueError):
+        split_ids(["A1,B2", "C3"], max_ids=2)
+
+
+def test_order_by_ids_follows_request_and_reports_missing():
+    found = {"A1": "supply A1", "C3": "supply C3"}
+    assert order_by_ids(["C3", "B2", "A1"], found) == {
+        "found": ["supply C3", "supply A1"],
+        "missing": ["B2"]
+    }